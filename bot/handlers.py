@@ -1,7 +1,7 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from database.crud import UserCRUD, APICredentialCRUD, StrategyCRUD, TradeCRUD
-from trading.delta_api import DeltaExchangeAPI
+from trading.delta_api import api_pool
 from trading.straddle_logic import StraddleStrategy
 from trading.strangle_logic import StrangleStrategy
 from trading.order_manager import OrderManager
@@ -11,6 +11,7 @@ from bot.validators import *
 from utils.helpers import Encryptor, format_currency, calculate_pnl
 from config.settings import ADMIN_TELEGRAM_IDS
 import logging
+import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     
     # Create or get user
-    db_user = user_crud.get_or_create_user(user.id, user.username or '', user.first_name or '')
+    db_user = await asyncio.to_thread(user_crud.get_or_create_user, user.id,
+                                      user.username or '', user.first_name or '')
     
     welcome_text = f"""
 👋 Welcome to **Straddle & Strangle Trading Bot**!
@@ -102,10 +104,10 @@ async def add_api_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def create_strategy_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start strategy creation process"""
     user = update.effective_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
     # Check if user has active API
-    active_api = api_crud.get_active_credential(str(db_user['_id']))
+    active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
     if not active_api:
         await update.message.reply_text(
             "⚠️ Please add and activate an API credential first using /addapi",
@@ -123,9 +125,9 @@ async def create_strategy_start(update: Update, context: ContextTypes.DEFAULT_TY
 async def list_strategies_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all user strategies"""
     user = update.effective_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
-    strategies = strategy_crud.get_user_strategies(str(db_user['_id']))
+    strategies = await asyncio.to_thread(strategy_crud.get_user_strategies, str(db_user['_id']))
     
     if not strategies:
         await update.message.reply_text(
@@ -145,9 +147,9 @@ async def list_strategies_command(update: Update, context: ContextTypes.DEFAULT_
 async def list_apis_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all user API credentials"""
     user = update.effective_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
-    apis = api_crud.get_user_credentials(str(db_user['_id']))
+    apis = await asyncio.to_thread(api_crud.get_user_credentials, str(db_user['_id']))
     
     if not apis:
         await update.message.reply_text(
@@ -168,9 +170,9 @@ async def list_apis_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def check_balance_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Check wallet balance for active API"""
     user = update.effective_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
-    active_api = api_crud.get_active_credential(str(db_user['_id']))
+    active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
     if not active_api:
         await update.message.reply_text(
             "⚠️ No active API found. Please select an API first.",
@@ -183,8 +185,8 @@ async def check_balance_command(update: Update, context: ContextTypes.DEFAULT_TY
     api_secret = encryptor.decrypt(active_api['api_secret_encrypted'])
     
     # Get balance
-    delta_api = DeltaExchangeAPI(api_key, api_secret)
-    balance_data = delta_api.get_wallet_balance()
+    delta_api = api_pool.get(api_key, api_secret)
+    balance_data = await delta_api.get_wallet_balance()
     
     if not balance_data:
         await update.message.reply_text(
@@ -209,9 +211,9 @@ Total: {format_currency(total)}
 async def show_positions_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show active positions"""
     user = update.effective_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
-    active_api = api_crud.get_active_credential(str(db_user['_id']))
+    active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
     if not active_api:
         await update.message.reply_text(
             "⚠️ No active API found.",
@@ -223,9 +225,9 @@ async def show_positions_command(update: Update, context: ContextTypes.DEFAULT_T
     api_key = encryptor.decrypt(active_api['api_key_encrypted'])
     api_secret = encryptor.decrypt(active_api['api_secret_encrypted'])
     
-    delta_api = DeltaExchangeAPI(api_key, api_secret)
+    delta_api = api_pool.get(api_key, api_secret)
     monitor = PositionMonitor(delta_api)
-    positions = monitor.get_active_positions_details()
+    positions = await monitor.get_active_positions_details()
     
     if not positions:
         await update.message.reply_text(
@@ -238,14 +240,14 @@ async def show_positions_command(update: Update, context: ContextTypes.DEFAULT_T
     total_pnl = 0
     
     for pos in positions:
-        pnl = pos['unrealized_pnl']
+        pnl = pos.unrealized_pnl
         total_pnl += pnl
         pnl_emoji = "🟢" if pnl >= 0 else "🔴"
         
-        positions_text += f"{pnl_emoji} {pos['symbol']}\n"
-        positions_text += f"   Entry: {format_currency(pos['entry_price'])}\n"
-        positions_text += f"   Current: {format_currency(pos['current_price'])}\n"
-        positions_text += f"   P&L: {format_currency(pnl)} ({pos['pnl_percentage']:.2f}%)\n\n"
+        positions_text += f"{pnl_emoji} {pos.symbol}\n"
+        positions_text += f"   Entry: {format_currency(pos.entry_price)}\n"
+        positions_text += f"   Current: {format_currency(pos.current_price)}\n"
+        positions_text += f"   P&L: {format_currency(pnl)} ({pos.pnl_percentage:.2f}%)\n\n"
     
     positions_text += f"**Total P&L: {format_currency(total_pnl)}**"
     
@@ -261,9 +263,9 @@ async def show_positions_command(update: Update, context: ContextTypes.DEFAULT_T
 async def trade_history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show trade history"""
     user = update.effective_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
-    trades = trade_crud.get_trade_history(str(db_user['_id']), limit=10)
+    trades = await asyncio.to_thread(trade_crud.get_trade_history, str(db_user['_id']), limit=10)
     
     if not trades:
         await update.message.reply_text(
@@ -363,11 +365,12 @@ async def handle_add_api_input(update: Update, context: ContextTypes.DEFAULT_TYP
             return
         
         # Encrypt and save
-        user = user_crud.get_user_by_telegram_id(user_id)
+        user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user_id)
         api_key_encrypted = encryptor.encrypt(state['api_key'])
         api_secret_encrypted = encryptor.encrypt(state['api_secret'])
         
-        api_id = api_crud.create_credential(
+        api_id = await asyncio.to_thread(
+            api_crud.create_credential,
             str(user['_id']),
             state['nickname'],
             api_key_encrypted,
@@ -376,9 +379,8 @@ async def handle_add_api_input(update: Update, context: ContextTypes.DEFAULT_TYP
         
         if api_id:
             # Set as active if it's the first API
-            apis = api_crud.get_user_credentials(str(user['_id']))
-            if len(apis) == 1:
-                api_crud.set_active_credential(str(user['_id']), api_id)
+            if await asyncio.to_thread(api_crud.count_user_credentials, str(user['_id'])) == 1:
+                await asyncio.to_thread(api_crud.set_active_credential, str(user['_id']), api_id)
             
             await context.bot.send_message(
                 chat_id=user_id,
@@ -424,6 +426,8 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
         await handle_position_callback(query, context, data)
     elif data.startswith('close_'):
         await handle_close_position_callback(query, context, data)
+    elif data == 'yes_close_all':
+        await handle_close_all_callback(query, context)
     elif data.startswith('back_'):
         await handle_back_callback(query, context, data)
 
@@ -439,8 +443,8 @@ async def handle_menu_callback(query, context, data):
         )
     elif action == 'strategies':
         user = query.from_user
-        db_user = user_crud.get_user_by_telegram_id(user.id)
-        strategies = strategy_crud.get_user_strategies(str(db_user['_id']))
+        db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
+        strategies = await asyncio.to_thread(strategy_crud.get_user_strategies, str(db_user['_id']))
         
         if not strategies:
             await query.edit_message_text(
@@ -457,8 +461,8 @@ async def handle_menu_callback(query, context, data):
             )
     elif action == 'apis':
         user = query.from_user
-        db_user = user_crud.get_user_by_telegram_id(user.id)
-        apis = api_crud.get_user_credentials(str(db_user['_id']))
+        db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
+        apis = await asyncio.to_thread(api_crud.get_user_credentials, str(db_user['_id']))
         
         if not apis:
             await query.edit_message_text(
@@ -511,8 +515,8 @@ async def handle_strategy_type_callback(query, context, data):
     if strategy_type == 'compare':
         # Show comparison between straddle and strangle
         user = query.from_user
-        db_user = user_crud.get_user_by_telegram_id(user.id)
-        active_api = api_crud.get_active_credential(str(db_user['_id']))
+        db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
+        active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
         
         if not active_api:
             await query.edit_message_text(
@@ -524,15 +528,15 @@ async def handle_strategy_type_callback(query, context, data):
         # Get API and create comparison
         api_key = encryptor.decrypt(active_api['api_key_encrypted'])
         api_secret = encryptor.decrypt(active_api['api_secret_encrypted'])
-        delta_api = DeltaExchangeAPI(api_key, api_secret)
+        delta_api = api_pool.get(api_key, api_secret)
         
-        spot_price = delta_api.get_spot_price('BTCUSD')
+        spot_price = await delta_api.get_spot_price('BTCUSD')
         if not spot_price:
             await query.edit_message_text("❌ Failed to fetch spot price")
             return
         
         strangle = StrangleStrategy(delta_api)
-        comparison = strangle.compare_with_straddle(spot_price, 2, 2, 'BTC')
+        comparison = await strangle.compare_with_straddle(spot_price, 2, 2, 'BTC')
         
         if comparison:
             comp_text = f"""
@@ -661,16 +665,16 @@ async def handle_execute_callback(query, context, data):
     """Handle strategy execution"""
     strategy_id = data.replace('execute_', '')
     user = query.from_user
-    db_user = user_crud.get_user_by_telegram_id(user.id)
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
     
     # Get strategy details
-    strategy = strategy_crud.get_strategy_by_id(strategy_id)
+    strategy = await asyncio.to_thread(strategy_crud.get_strategy_by_id, strategy_id)
     if not strategy:
         await query.edit_message_text("❌ Strategy not found")
         return
     
     # Get active API
-    active_api = api_crud.get_active_credential(str(db_user['_id']))
+    active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
     if not active_api:
         await query.edit_message_text("⚠️ No active API found")
         return
@@ -678,10 +682,14 @@ async def handle_execute_callback(query, context, data):
     # Decrypt credentials
     api_key = encryptor.decrypt(active_api['api_key_encrypted'])
     api_secret = encryptor.decrypt(active_api['api_secret_encrypted'])
-    delta_api = DeltaExchangeAPI(api_key, api_secret)
+    delta_api = api_pool.get(api_key, api_secret)
     
-    # Get spot price
-    spot_price = delta_api.get_spot_price('BTCUSD')
+    # Get spot price; the option listing the strike lookup needs is
+    # independent of it, so warm that cache in the same round trip
+    spot_price, _ = await asyncio.gather(
+        delta_api.get_spot_price('BTCUSD'),
+        delta_api.get_products()
+    )
     if not spot_price:
         await query.edit_message_text("❌ Failed to fetch spot price")
         return
@@ -693,14 +701,14 @@ async def handle_execute_callback(query, context, data):
     # Execute based on strategy type
     if strategy_type == 'straddle':
         straddle = StraddleStrategy(delta_api)
-        options = straddle.find_atm_options(spot_price, 'BTC', strategy['expiry_type'])
+        options = await straddle.find_atm_options(spot_price, 'BTC', strategy['expiry_type'])
         
         if not options:
             await query.edit_message_text("❌ Failed to find ATM options")
             return
         
         call_option, put_option = options
-        details = straddle.calculate_straddle_details(call_option, put_option, lot_size, direction)
+        details = await straddle.calculate_straddle_details(call_option, put_option, lot_size, direction)
         
     else:  # strangle
         strangle = StrangleStrategy(delta_api)
@@ -711,14 +719,14 @@ async def handle_execute_callback(query, context, data):
             strategy['put_strike_offset']
         )
         
-        options = strangle.find_otm_options(call_strike, put_strike, 'BTC', strategy['expiry_type'])
+        options = await strangle.find_otm_options(call_strike, put_strike, 'BTC', strategy['expiry_type'])
         
         if not options:
             await query.edit_message_text("❌ Failed to find OTM options")
             return
         
         call_option, put_option = options
-        details = strangle.calculate_strangle_details(
+        details = await strangle.calculate_strangle_details(
             call_option, put_option, atm_strike, lot_size, direction
         )
     
@@ -773,7 +781,7 @@ async def handle_confirm_callback(query, context, data):
     
     if action == 'trade':
         user = query.from_user
-        db_user = user_crud.get_user_by_telegram_id(user.id)
+        db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
         
         # Get pending trade details
         details = context.user_data.get('pending_trade')
@@ -785,40 +793,32 @@ async def handle_confirm_callback(query, context, data):
             return
         
         # Get API
-        active_api = api_crud.get_active_credential(str(db_user['_id']))
+        active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
         api_key = encryptor.decrypt(active_api['api_key_encrypted'])
         api_secret = encryptor.decrypt(active_api['api_secret_encrypted'])
-        delta_api = DeltaExchangeAPI(api_key, api_secret)
+        delta_api = api_pool.get(api_key, api_secret)
         
         # Validate margin
         if strategy_type == 'straddle':
-            straddle = StraddleStrategy(delta_api)
-            if not straddle.validate_margin(details['total_cost']):
-                await query.edit_message_text("❌ Insufficient margin for this trade")
-                return
-            
-            # Execute trade
-            await query.edit_message_text("⏳ Executing trade...")
-            call_order, put_order = straddle.execute_straddle(
-                details['call_product_id'],
-                details['put_product_id'],
-                details['lot_size'],
-                details['direction']
-            )
+            strategy = StraddleStrategy(delta_api)
+            execute = strategy.execute_straddle
         else:
-            strangle = StrangleStrategy(delta_api)
-            if not strangle.validate_margin(details['total_cost']):
-                await query.edit_message_text("❌ Insufficient margin for this trade")
-                return
-            
-            # Execute trade
-            await query.edit_message_text("⏳ Executing trade...")
-            call_order, put_order = strangle.execute_strangle(
-                details['call_product_id'],
-                details['put_product_id'],
-                details['lot_size'],
-                details['direction']
-            )
+            strategy = StrangleStrategy(delta_api)
+            execute = strategy.execute_strangle
+        
+        if not await strategy.validate_margin(details['total_cost']):
+            await query.edit_message_text("❌ Insufficient margin for this trade")
+            return
+        
+        # Execute trade; the status message goes out while the orders are placed
+        notice = asyncio.create_task(query.edit_message_text("⏳ Executing trade..."))
+        call_order, put_order = await execute(
+            details['call_product_id'],
+            details['put_product_id'],
+            details['lot_size'],
+            details['direction']
+        )
+        await asyncio.gather(notice, return_exceptions=True)
         
         if not call_order or not put_order:
             await query.edit_message_text("❌ Trade execution failed")
@@ -831,7 +831,8 @@ async def handle_confirm_callback(query, context, data):
         call_fill_price = order_mgr.get_fill_price(call_order)
         put_fill_price = order_mgr.get_fill_price(put_order)
         
-        trade_id = trade_crud.create_trade(
+        trade_id = await asyncio.to_thread(
+            trade_crud.create_trade,
             user_id=str(db_user['_id']),
             api_id=str(active_api['_id']),
             strategy_id=strategy_id,
@@ -846,6 +847,7 @@ async def handle_confirm_callback(query, context, data):
             call_entry_price=call_fill_price,
             put_entry_price=put_fill_price,
             lot_size=details['lot_size'],
+            direction=details['direction'],
             stop_loss_pct=20.0,  # From strategy
             upper_breakeven=details['upper_breakeven'],
             lower_breakeven=details['lower_breakeven']
@@ -871,6 +873,38 @@ Monitor your position with /positions
         context.user_data.pop('pending_trade', None)
         context.user_data.pop('strategy_id', None)
 
+async def handle_close_all_callback(query, context):
+    """Close every listed position after confirmation"""
+    positions = context.user_data.get('positions', [])
+    if not positions:
+        await query.edit_message_text("❌ No positions to close")
+        return
+    
+    user = query.from_user
+    db_user = await asyncio.to_thread(user_crud.get_user_by_telegram_id, user.id)
+    active_api = await asyncio.to_thread(api_crud.get_active_credential, str(db_user['_id']))
+    api_key = encryptor.decrypt(active_api['api_key_encrypted'])
+    api_secret = encryptor.decrypt(active_api['api_secret_encrypted'])
+    delta_api = api_pool.get(api_key, api_secret)
+    
+    await query.edit_message_text("⏳ Closing all positions...")
+    order_mgr = OrderManager(delta_api)
+    results = await order_mgr.close_positions([position.product_id for position in positions])
+    
+    failed = [position.symbol for position in positions if not results.get(position.product_id)]
+    context.user_data.pop('positions', None)
+    
+    if failed:
+        await query.edit_message_text(
+            f"⚠️ Some positions could not be closed: {', '.join(failed)}",
+            reply_markup=get_main_menu_keyboard()
+        )
+    else:
+        await query.edit_message_text(
+            f"✅ Closed {len(positions)} position(s)",
+            reply_markup=get_main_menu_keyboard()
+        )
+
 async def handle_close_position_callback(query, context, data):
     """Handle position closure"""
     if data == 'close_all_positions':
@@ -893,8 +927,8 @@ async def handle_close_position_callback(query, context, data):
         confirm_text = f"""
 ⚠️ **Close Position**
 
-Symbol: {position['symbol']}
-Current P&L: {format_currency(position['unrealized_pnl'])}
+Symbol: {position.symbol}
+Current P&L: {format_currency(position.unrealized_pnl)}
 
 Proceed with closing?
         """
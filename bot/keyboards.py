@@ -1,5 +1,8 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from typing import List, Dict
+from typing import List, Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from trading.position_monitor import Position
 
 def get_main_menu_keyboard() -> InlineKeyboardMarkup:
     """Main menu keyboard"""
@@ -124,13 +127,13 @@ def get_api_action_keyboard(api_id: str, is_active: bool) -> InlineKeyboardMarku
     
     return InlineKeyboardMarkup(keyboard)
 
-def get_positions_keyboard(positions: List[Dict]) -> InlineKeyboardMarkup:
+def get_positions_keyboard(positions: List['Position']) -> InlineKeyboardMarkup:
     """Display active positions"""
     keyboard = []
     
     for i, pos in enumerate(positions):
-        symbol = pos.get('symbol', 'Unknown')
-        pnl = pos.get('unrealized_pnl', 0)
+        symbol = pos.symbol or 'Unknown'
+        pnl = pos.unrealized_pnl
         pnl_emoji = "🟢" if pnl >= 0 else "🔴"
         
         button_text = f"{pnl_emoji} {symbol} | P&L: ₹{pnl:.2f}"
@@ -4,7 +4,7 @@ from telegram import Bot
 from telegram.constants import ParseMode
 from config.database import Database
 from utils.logger import bot_logger
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 
 
@@ -78,7 +78,7 @@ class NotificationService:
                 message += f"<b>Fill Price:</b> ${price:.2f}\n"
                 message += f"<b>Size:</b> {size}\n"
                 message += f"<b>Type:</b> {order_type}\n"
-                message += f"<b>Time:</b> {datetime.utcnow().strftime('%H:%M:%S UTC')}"
+                message += f"<b>Time:</b> {datetime.now(timezone.utc).strftime('%H:%M:%S UTC')}"
                 
             elif fill_type == "STOP_LOSS":
                 message = f"{emoji} <b>Stop-Loss Triggered</b>\n\n"
@@ -86,7 +86,7 @@ class NotificationService:
                 message += f"<b>Side:</b> {side}\n"
                 message += f"<b>Fill Price:</b> ${price:.2f}\n"
                 message += f"<b>Size:</b> {size}\n"
-                message += f"<b>Time:</b> {datetime.utcnow().strftime('%H:%M:%S UTC')}\n\n"
+                message += f"<b>Time:</b> {datetime.now(timezone.utc).strftime('%H:%M:%S UTC')}\n\n"
                 message += "⚠️ <i>Position closed by stop-loss</i>"
                 
             elif fill_type == "TAKE_PROFIT":
@@ -95,7 +95,7 @@ class NotificationService:
                 message += f"<b>Side:</b> {side}\n"
                 message += f"<b>Fill Price:</b> ${price:.2f}\n"
                 message += f"<b>Size:</b> {size}\n"
-                message += f"<b>Time:</b> {datetime.utcnow().strftime('%H:%M:%S UTC')}\n\n"
+                message += f"<b>Time:</b> {datetime.now(timezone.utc).strftime('%H:%M:%S UTC')}\n\n"
                 message += "🎉 <i>Target reached!</i>"
             
             # Send notification
@@ -174,7 +174,7 @@ class OrderFillTracker:
                         {
                             '$set': {
                                 'state': 'filled',
-                                'filled_at': datetime.utcnow()
+                                'filled_at': datetime.now(timezone.utc)
                             }
                         }
                     )
@@ -212,7 +212,7 @@ class OrderFillTracker:
                     'stop_price': order.get('stop_price'),
                     'limit_price': order.get('limit_price'),
                     'reduce_only': order.get('reduce_only', False),
-                    'updated_at': datetime.utcnow()
+                    'updated_at': datetime.now(timezone.utc)
                 }
                 
                 await db.order_states.update_one(
@@ -0,0 +1,77 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Set
+from telegram import Update
+from telegram.ext import Application
+from config.settings import UPDATE_ROUTER_MAX_CHATS, UPDATE_ROUTER_IDLE_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UpdateRouter:
+    """Process updates in order within a chat and in parallel across chats"""
+
+    def __init__(self, application: Application,
+                 max_chats: int = UPDATE_ROUTER_MAX_CHATS,
+                 idle_timeout: float = UPDATE_ROUTER_IDLE_SECONDS):
+        self.application = application
+        self.max_chats = max_chats
+        self.idle_timeout = idle_timeout
+        self.chat_queues: Dict[int, asyncio.Queue] = {}
+        self.chat_tasks: "OrderedDict[int, asyncio.Task]" = OrderedDict()
+        self._idle_chats: Set[int] = set()
+
+    def enqueue(self, chat_id: int, update: Update):
+        """Queue an update for its chat; must be called on the router's loop"""
+        queue = self.chat_queues.get(chat_id)
+        if queue is None:
+            queue = asyncio.Queue()
+            self.chat_queues[chat_id] = queue
+            self.chat_tasks[chat_id] = asyncio.create_task(self._worker(chat_id, queue))
+            self._evict_idle()
+        else:
+            self.chat_tasks.move_to_end(chat_id)
+        queue.put_nowait(update)
+
+    async def _worker(self, chat_id: int, queue: asyncio.Queue):
+        """Drain one chat's queue, exiting after idle_timeout without updates"""
+        try:
+            while True:
+                self._idle_chats.add(chat_id)
+                try:
+                    update = await asyncio.wait_for(queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        return
+                    continue
+                finally:
+                    self._idle_chats.discard(chat_id)
+
+                try:
+                    await self.application.process_update(update)
+                except Exception as e:
+                    logger.error(f"Error processing update for chat {chat_id}: {e}")
+        finally:
+            if self.chat_queues.get(chat_id) is queue:
+                del self.chat_queues[chat_id]
+                del self.chat_tasks[chat_id]
+
+    def _evict_idle(self):
+        """Stop least recently used idle workers once more than max_chats exist"""
+        for chat_id in list(self.chat_tasks):
+            if len(self.chat_tasks) <= self.max_chats:
+                break
+            if chat_id in self._idle_chats and self.chat_queues[chat_id].empty():
+                self.chat_tasks.pop(chat_id).cancel()
+                del self.chat_queues[chat_id]
+                self._idle_chats.discard(chat_id)
+
+    async def stop(self):
+        """Cancel all chat workers"""
+        tasks = list(self.chat_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.chat_queues.clear()
+        self.chat_tasks.clear()
+        self._idle_chats.clear()
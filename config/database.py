@@ -1,5 +1,7 @@
 from pymongo import MongoClient
-from config.settings import MONGODB_URI, DB_NAME
+from config.settings import (
+    MONGODB_URI, DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_SERVER_SELECTION_TIMEOUT_MS
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +18,13 @@ class Database:
 
     def connect(self):
         try:
-            self._client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
+            # One pooled client per worker; a short selection timeout lets
+            # /health report an unreachable cluster instead of hanging on it
+            self._client = MongoClient(
+                MONGODB_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS
+            )
             self._db = self._client[DB_NAME]
             self._client.admin.command('ping')
             logger.info("Successfully connected to MongoDB")
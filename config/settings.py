@@ -10,13 +10,19 @@ WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # https://your-app.onrender.com
 # Database Configuration
 MONGODB_URI = os.getenv('MONGODB_URI')
 DB_NAME = 'straddle_bot'
+MONGO_MAX_POOL_SIZE = 50
+MONGO_SERVER_SELECTION_TIMEOUT_MS = 2000
 
 # Encryption Configuration
 ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')
 
 # Server Configuration
 HOST = '0.0.0.0'
-PORT = 10000
+PORT = int(os.getenv('PORT', 10000))
+
+# Update Dispatch Configuration
+UPDATE_ROUTER_MAX_CHATS = 1024
+UPDATE_ROUTER_IDLE_SECONDS = 30
 
 # Delta Exchange Configuration
 DELTA_BASE_URL = 'https://api.india.delta.exchange'
@@ -27,7 +33,17 @@ ADMIN_TELEGRAM_IDS = [int(id.strip()) for id in os.getenv('ADMIN_TELEGRAM_IDS',
 # Trading Configuration
 MAX_RETRIES = 3
 API_TIMEOUT = 10
+API_CONNECT_TIMEOUT = 3
+MAX_RESPONSE_BYTES = 5_000_000
+HTTP_POOL_LIMIT = 64
+HTTP_POOL_LIMIT_PER_HOST = 16
+HTTP_DNS_CACHE_SECONDS = 300
+HTTP_KEEPALIVE_SECONDS = 75
+API_CLIENT_POOL_SIZE = 256
 OPTION_CHAIN_CACHE_SECONDS = 30
+PRODUCTS_CACHE_SECONDS = 300
+SPOT_PRICE_CACHE_SECONDS = 0.5
+TICKER_MAX_CONCURRENT_REQUESTS = 5
 
 # Risk Management
 DEFAULT_MAX_LOSS_PER_TRADE_PCT = 5.0
@@ -1,5 +1,7 @@
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
 from config.database import db_instance
 import logging
 
@@ -45,17 +47,25 @@ class APICredentialCRUD:
             return None
 
     def get_user_credentials(self, user_id: str) -> List[Dict]:
-        return list(self.collection.find({'user_id': user_id}))
+        # Listings never need the encrypted key material
+        return list(self.collection.find(
+            {'user_id': user_id},
+            {'api_key_encrypted': 0, 'api_secret_encrypted': 0}
+        ))
+
+    def count_user_credentials(self, user_id: str) -> int:
+        return self.collection.count_documents({'user_id': user_id})
 
     def get_active_credential(self, user_id: str) -> Optional[Dict]:
         return self.collection.find_one({'user_id': user_id, 'is_active': True})
 
     def set_active_credential(self, user_id: str, api_id: str) -> bool:
         try:
-            # Deactivate all
-            self.collection.update_many({'user_id': user_id}, {'$set': {'is_active': False}})
-            # Activate selected
-            self.collection.update_one({'_id': ObjectId(api_id)}, {'$set': {'is_active': True}})
+            # Deactivate all, then activate selected, in one ordered round trip
+            self.collection.bulk_write([
+                UpdateMany({'user_id': user_id}, {'$set': {'is_active': False}}),
+                UpdateOne({'_id': ObjectId(api_id)}, {'$set': {'is_active': True}})
+            ], ordered=True)
             return True
         except Exception as e:
             logger.error(f"Error setting active credential: {e}")
@@ -123,13 +133,12 @@ class TradeCRUD:
     def update_trade_exit(self, trade_id: str, call_exit_price: float, 
                          put_exit_price: float, pnl: float) -> bool:
         try:
-            from datetime import datetime
             self.collection.update_one(
                 {'_id': ObjectId(trade_id)},
                 {'$set': {
                     'call_exit_price': call_exit_price,
                     'put_exit_price': put_exit_price,
-                    'exit_time': datetime.utcnow(),
+                    'exit_time': datetime.now(timezone.utc),
                     'pnl': pnl,
                     'status': 'closed'
                 }}
@@ -140,6 +149,7 @@ class TradeCRUD:
             return False
 
     def get_trade_history(self, user_id: str, limit: int = 20) -> List[Dict]:
-        return list(self.collection.find({'user_id': user_id})
+        projection = {'entry_time': 1, 'strategy_type': 1, 'pnl': 1, 'status': 1}
+        return list(self.collection.find({'user_id': user_id}, projection)
                    .sort('entry_time', -1).limit(limit))
         
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
+from utils.helpers import premium_trigger_levels
 
 class UserModel:
     @staticmethod
@@ -8,7 +9,7 @@ class UserModel:
             'telegram_id': telegram_id,
             'username': username,
             'first_name': first_name,
-            'created_at': datetime.utcnow(),
+            'created_at': datetime.now(timezone.utc),
             'is_active': True,
             'daily_loss_limit_pct': 10.0,
             'max_loss_per_trade_pct': 5.0
@@ -24,7 +25,7 @@ class APICredentialModel:
             'api_key_encrypted': api_key_encrypted,
             'api_secret_encrypted': api_secret_encrypted,
             'is_active': True,
-            'created_at': datetime.utcnow()
+            'created_at': datetime.now(timezone.utc)
         }
 
 class StrategyModel:
@@ -44,7 +45,7 @@ class StrategyModel:
             'strike_offset': kwargs.get('strike_offset', 0),
             'max_capital': kwargs.get('max_capital'),
             'trailing_sl': kwargs.get('trailing_sl', False),
-            'created_at': datetime.utcnow()
+            'created_at': datetime.now(timezone.utc)
         }
         
         # Add strangle-specific fields
@@ -64,6 +65,14 @@ class TradeModel:
     @staticmethod
     def create(user_id: str, api_id: str, strategy_id: str, strategy_type: str,
                call_symbol: str, put_symbol: str, strike: float, **kwargs) -> Dict[str, Any]:
+        call_entry = kwargs.get('call_entry_price')
+        put_entry = kwargs.get('put_entry_price')
+        direction = kwargs.get('direction', 'long')
+        entry_premium = call_entry + put_entry if call_entry is not None and put_entry is not None else None
+        # Fixed for the trade's life, so monitoring compares against stored levels
+        sl_premium, tp_premium = premium_trigger_levels(
+            entry_premium, direction, kwargs.get('stop_loss_pct'), kwargs.get('target_pct')
+        )
         return {
             'user_id': user_id,
             'api_id': api_id,
@@ -75,10 +84,12 @@ class TradeModel:
             'call_strike': kwargs.get('call_strike', strike),
             'put_strike': kwargs.get('put_strike', strike),
             'spot_at_entry': kwargs.get('spot_at_entry'),
-            'entry_time': datetime.utcnow(),
+            'entry_time': datetime.now(timezone.utc),
             'exit_time': None,
-            'call_entry_price': kwargs.get('call_entry_price'),
-            'put_entry_price': kwargs.get('put_entry_price'),
+            'direction': direction,
+            'call_entry_price': call_entry,
+            'put_entry_price': put_entry,
+            'entry_premium': entry_premium,
             'call_exit_price': None,
             'put_exit_price': None,
             'lot_size': kwargs.get('lot_size'),
@@ -86,6 +97,8 @@ class TradeModel:
             'status': 'active',  # active, closed, partial
             'stop_loss_pct': kwargs.get('stop_loss_pct'),
             'target_pct': kwargs.get('target_pct'),
+            'sl_premium': sl_premium,
+            'tp_premium': tp_premium,
             'upper_breakeven': kwargs.get('upper_breakeven'),
             'lower_breakeven': kwargs.get('lower_breakeven')
         }
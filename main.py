@@ -1,9 +1,14 @@
 import logging
+import uvicorn
+from asgiref.wsgi import WsgiToAsgi
 from flask import Flask, request, Response
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 from config.settings import TELEGRAM_BOT_TOKEN, WEBHOOK_URL, HOST, PORT
 from config.database import db_instance
+from trading.http import close_session
+from trading.delta_api import api_pool
+from bot.update_router import UpdateRouter
 from bot.handlers import (
     start_command, help_command, add_api_start, create_strategy_start,
     list_strategies_command, list_apis_command, check_balance_command,
@@ -11,8 +16,14 @@ from bot.handlers import (
     handle_callback_query
 )
 from utils.logger import setup_logger
+from utils.helpers import json_dumps, json_loads
 import asyncio
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
 # Setup logging
 logger = setup_logger()
 
@@ -21,6 +32,11 @@ app = Flask(__name__)
 
 # Initialize Telegram bot application
 telegram_app = None
+update_router = None
+
+# The Telegram application, its per-chat workers and the HTTP server share
+# one loop; the WSGI webhook view runs in a worker thread and hands updates to it
+bot_loop = None
 
 def create_telegram_app():
     """Create and configure Telegram application"""
@@ -46,37 +62,65 @@ def create_telegram_app():
     return application
 
 @app.route('/webhook', methods=['POST'])
-async def webhook():
+def webhook():
     """Handle incoming webhook updates from Telegram"""
     try:
-        json_data = request.get_json(force=True)
+        json_data = json_loads(request.get_data())
         update = Update.de_json(json_data, telegram_app.bot)
-        await telegram_app.process_update(update)
+        chat_id = update.effective_chat.id if update.effective_chat else 0
+        # Acknowledge immediately; slow commands no longer hold up other chats
+        bot_loop.call_soon_threadsafe(update_router.enqueue, chat_id, update)
         return Response(status=200)
     except Exception as e:
         logger.error(f"Webhook error: {e}")
         return Response(status=500)
 
-@app.route('/health', methods=['GET'])
-def health_check():
+@app.route('/', methods=['GET'])
+def index():
+    """Root endpoint"""
+    return {'message': 'Telegram Straddle Bot is running', 'status': 'active'}, 200
+
+async def health_check():
     """Health check endpoint for UptimeRobot"""
     try:
         # Check database connection
         db = db_instance.get_db()
-        db.command('ping')
+        await asyncio.to_thread(db.command, 'ping')
         return {'status': 'healthy', 'service': 'telegram-bot'}, 200
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return {'status': 'unhealthy', 'error': str(e)}, 500
 
-@app.route('/', methods=['GET'])
-def index():
-    """Root endpoint"""
-    return {'message': 'Telegram Straddle Bot is running', 'status': 'active'}, 200
+wsgi_app = WsgiToAsgi(app)
+
+async def asgi_app(scope, receive, send):
+    """Serve /health directly and everything else through the Flask app"""
+    if scope['type'] == 'lifespan':
+        # Startup and shutdown run in main(), so just acknowledge both;
+        # WsgiToAsgi only understands http scopes
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    # WsgiToAsgi runs every Flask view on one shared thread, so a slow
+    # database ping there would queue webhook deliveries behind it
+    if scope['type'] == 'http' and scope['path'] == '/health':
+        body, status = await health_check()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json')]
+        })
+        await send({'type': 'http.response.body', 'body': json_dumps(body)})
+        return
+    await wsgi_app(scope, receive, send)
 
 async def setup_webhook():
     """Setup webhook with Telegram"""
-    global telegram_app
+    global telegram_app, update_router
     
     telegram_app = create_telegram_app()
     await telegram_app.initialize()
@@ -94,13 +138,25 @@ async def setup_webhook():
         logger.error("Failed to set webhook")
     
     await telegram_app.start()
+    update_router = UpdateRouter(telegram_app)
 
-def run_flask():
-    """Run Flask server"""
-    logger.info(f"Starting Flask server on {HOST}:{PORT}")
-    app.run(host=HOST, port=PORT, debug=False)
+async def shutdown():
+    """Stop the bot and release shared connections"""
+    if update_router:
+        await update_router.stop()
+    if telegram_app and telegram_app.running:
+        await telegram_app.stop()
+    if telegram_app:
+        await telegram_app.shutdown()
+    db_instance.close()
+    api_pool.clear()
+    await close_session()
 
-if __name__ == '__main__':
+async def main():
+    """Set up the webhook and serve HTTP on a single event loop"""
+    global bot_loop
+    bot_loop = asyncio.get_running_loop()
+    
     try:
         # Connect to database
         logger.info("Connecting to MongoDB...")
@@ -108,16 +164,18 @@ if __name__ == '__main__':
         
         # Setup webhook
         logger.info("Setting up Telegram webhook...")
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(setup_webhook())
-        
-        # Run Flask server
-        run_flask()
+        await setup_webhook()
         
-    except KeyboardInterrupt:
-        logger.info("Shutting down...")
-        db_instance.close()
+        logger.info(f"Starting server on {HOST}:{PORT}")
+        config = uvicorn.Config(asgi_app, host=HOST, port=PORT, log_level='info')
+        await uvicorn.Server(config).serve()
     except Exception as e:
         logger.error(f"Application error: {e}")
-        db_instance.close()
-    
+    finally:
+        logger.info("Shutting down...")
+        await shutdown()
+
+if __name__ == '__main__':
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(main())
@@ -1,106 +1,390 @@
 import hmac
-import hashlib
 import time
-import requests
-from typing import Dict, List, Optional, Any
-from config.settings import DELTA_BASE_URL, API_TIMEOUT, MAX_RETRIES
+import asyncio
+import aiohttp
+from yarl import URL
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import urlencode
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from config.settings import (
+    MAX_RETRIES, PRODUCTS_CACHE_SECONDS, API_CLIENT_POOL_SIZE,
+    SPOT_PRICE_CACHE_SECONDS, MAX_RESPONSE_BYTES, TICKER_MAX_CONCURRENT_REQUESTS
+)
+from trading.http import get_session
+from utils.helpers import json_dumps, json_loads, parse_expiry, get_expiry_date
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Product listings are public and only change on expiry rollover, so one
+# snapshot per contract_types is shared by every account in the process.
+# Each entry is (fetched_at, products, option chains indexed by
+# (underlying, expiry)); the chains are built lazily on first lookup.
+_products_cache: Dict[str, Tuple[float, List[Dict], Dict[Tuple[str, Optional[str]], 'OptionChain']]] = {}
+# Concurrent refreshes of one snapshot wait on a single in-flight fetch
+# instead of each downloading; different contract_types refresh independently
+_products_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# Pre-encoded HTTP methods for the signature message
+_METHOD_BYTES = {'GET': b'GET', 'POST': b'POST', 'PUT': b'PUT', 'DELETE': b'DELETE'}
+
+# Statuses worth retrying; any other error is returned to the caller at once
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Option-chain bucket and symbol prefix (e.g. C-BTC-90000-310125) for each
+# option contract_type
+_OPTION_BUCKETS = {'call_options': ('calls', 'C-'), 'put_options': ('puts', 'P-')}
+
+# Spot lookups accept either the underlying or its perpetual contract symbol
+_CONTRACT_MAP = {'BTC': 'BTCUSD', 'ETH': 'ETHUSD'}
+_POSITION_UNDERLYINGS = ('BTC', 'ETH')
+
+# Latest spot per contract as (fetched_at, price), shared so a burst of
+# strategy evaluations within one bot response reuses a single quote
+_spot_cache: Dict[str, Tuple[float, float]] = {}
+
+# Ticker fetches in flight per symbol; tickers are public, so any account's
+# request can serve every concurrent caller
+_ticker_inflight: Dict[str, asyncio.Future] = {}
+
+@dataclass(slots=True, frozen=True)
+class OptionChain:
+    """Calls and puts for one underlying (and optionally one expiry), indexed once
+    per products snapshot; *_by_strike map the rounded strike to its contract,
+    strikes lists, in order, the strikes listed as both a call and a put, and
+    expiries the distinct DDMMYY expiries listed, earliest first"""
+    calls: List[Dict]
+    puts: List[Dict]
+    calls_by_strike: Dict[int, Dict]
+    puts_by_strike: Dict[int, Dict]
+    strikes: Tuple[int, ...]
+    expiries: Tuple[str, ...]
+
+    @classmethod
+    def from_products(cls, products: List[Dict], underlying: str,
+                      expiry: Optional[str] = None) -> 'OptionChain':
+        options = {'calls': [], 'puts': []}
+        prefixes = {prefix: f"{prefix}{underlying}-" for prefix in ('C-', 'P-')}
+        suffix = f"-{expiry}" if expiry else ''
+        for product in products:
+            # Cheap type lookup first; the symbol test only runs for options
+            option = _OPTION_BUCKETS.get(product.get('contract_type'))
+            if not option:
+                continue
+            symbol = product.get('symbol', '')
+            if symbol.startswith(prefixes[option[1]]) and symbol.endswith(suffix):
+                options[option[0]].append(product)
+        # Strike lookups are dict hits; the first listed contract wins a tie
+        by_strike = {}
+        for bucket in ('calls', 'puts'):
+            index = {}
+            for product in options[bucket]:
+                index.setdefault(round(float(product.get('strike_price', 0))), product)
+            by_strike[bucket] = index
+        # A few expiries span hundreds of contracts: dedupe before parsing
+        suffixes = {product.get('symbol', '').rpartition('-')[2]
+                    for bucket in ('calls', 'puts') for product in options[bucket]}
+        expiry_dates = {suffix: parse_expiry(suffix) for suffix in suffixes}
+        return cls(
+            calls=options['calls'],
+            puts=options['puts'],
+            calls_by_strike=by_strike['calls'],
+            puts_by_strike=by_strike['puts'],
+            strikes=tuple(sorted(by_strike['calls'].keys() & by_strike['puts'].keys())),
+            expiries=tuple(sorted((suffix for suffix, listed in expiry_dates.items() if listed),
+                                  key=expiry_dates.get))
+        )
+
+    def nearest_strike(self, price: float) -> Optional[int]:
+        """Listed straddle strike closest to price; the lower one on a tie"""
+        strikes = self.strikes
+        if not strikes:
+            return None
+        i = bisect_left(strikes, price)
+        if i == 0:
+            return strikes[0]
+        if i == len(strikes):
+            return strikes[-1]
+        below, above = strikes[i - 1], strikes[i]
+        return below if price - below <= above - price else above
+
+@lru_cache(maxsize=256)
+def _encode_query(items: Tuple[Tuple[str, Any], ...]) -> str:
+    """Encode query parameters with the leading '?' Delta signs"""
+    return '?' + urlencode(items)
+
 class DeltaExchangeAPI:
-    def __init__(self, api_key: str, api_secret: str):
+    def __init__(self, api_key: str, api_secret: str,
+                 session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = DELTA_BASE_URL
+        # Without an explicit session, the shared pooled one is used per request;
+        # an injected session must be created with the exchange as its base_url
+        self._session = session
+        self._secret_bytes = api_secret.encode('utf-8')
+        # Keyed HMAC state is derived once; each signature clones it. A string
+        # digestmod keeps the whole HMAC inside OpenSSL's EVP implementation
+        self._hmac_template = hmac.new(self._secret_bytes, None, 'sha256')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # The session is shared across clients and closed on app shutdown
+        return False
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session or get_session()
 
     def _generate_signature(self, method: str, endpoint: str, 
-                           query_string: str = '', body: str = '') -> tuple:
+                           query_string: str = '', body: bytes = b'') -> tuple:
         """Generate HMAC-SHA256 signature for Delta Exchange API"""
         timestamp = str(int(time.time()))
-        message = method + timestamp + endpoint + query_string + body
+        message = b''.join((
+            _METHOD_BYTES.get(method) or method.encode(),
+            timestamp.encode(),
+            endpoint.encode(),
+            query_string.encode(),
+            body
+        ))
         
-        signature = hmac.new(
-            self.api_secret.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
+        h = self._hmac_template.copy()
+        h.update(message)
+        signature = h.hexdigest()
         
         return signature, timestamp
 
-    def _make_request(self, method: str, endpoint: str, 
+    async def _read_json(self, response: aiohttp.ClientResponse, endpoint: str) -> Optional[Dict]:
+        """Decode a JSON body, refusing anything larger than MAX_RESPONSE_BYTES"""
+        length = response.content_length
+        if length and length > MAX_RESPONSE_BYTES:
+            logger.error("Oversized response from %s: %s bytes", endpoint, length)
+            return None
+        
+        if length is not None and 'Content-Encoding' not in response.headers:
+            # Declared size is the decoded size and already checked: read in one go
+            body = await response.read()
+        else:
+            # Chunked body: count bytes as they arrive
+            chunks = []
+            size = 0
+            async for chunk in response.content.iter_chunked(65536):
+                size += len(chunk)
+                if size > MAX_RESPONSE_BYTES:
+                    logger.error("Oversized response from %s: over %s bytes", endpoint, MAX_RESPONSE_BYTES)
+                    return None
+                chunks.append(chunk)
+            body = b''.join(chunks)
+        try:
+            return json_loads(body)
+        except ValueError as e:
+            # A malformed 200 body won't improve on retry
+            logger.error("Invalid JSON from %s: %s", endpoint, e)
+            return None
+
+    async def _make_request(self, method: str, endpoint: str, 
                      params: Optional[Dict] = None, 
-                     data: Optional[Dict] = None) -> Optional[Dict]:
-        """Make authenticated request to Delta Exchange API"""
-        url = f"{self.base_url}{endpoint}"
+                     data: Optional[Dict] = None,
+                     auth: bool = True) -> Optional[Dict]:
+        """Make a request to Delta Exchange API, signed unless auth is False"""
         query_string = ''
-        body = ''
+        body = b''
         
         if params:
-            query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-            url += f"?{query_string}"
+            # Hot endpoints repeat the same few parameter sets; encode each once.
+            # Callers pass only set, scalar values, so nothing is filtered here
+            query_string = _encode_query(tuple(params.items()))
+        # Marked encoded so aiohttp sends the exact bytes that were signed
+        url = URL(endpoint + query_string, encoded=True)
         
         if data:
-            import json
-            body = json.dumps(data)
+            # Sign and send the same serialized bytes
+            body = json_dumps(data)
         
-        signature, timestamp = self._generate_signature(method, endpoint, query_string, body)
-        
-        headers = {
-            'api-key': self.api_key,
-            'signature': signature,
-            'timestamp': timestamp,
-            'User-Agent': 'TelegramStraddleBot/1.0',
-            'Content-Type': 'application/json'
-        }
+        return await self._send(method, endpoint, url, query_string, body, auth)
+
+    async def _get(self, endpoint: str) -> Optional[Dict]:
+        """Signed GET with no query or body, skipping request preparation"""
+        return await self._send('GET', endpoint, URL(endpoint, encoded=True), '', b'', True)
+
+    async def _send(self, method: str, endpoint: str, url: URL,
+                    query_string: str, body: bytes, auth: bool) -> Optional[Dict]:
+        """Send a prepared request, retrying transient failures"""
+        # Public market data needs no signature or api-key
+        headers = None
         
         for attempt in range(MAX_RETRIES):
+            if auth:
+                # Sign per attempt: a retry after backoff would otherwise carry
+                # a timestamp outside Delta's replay window
+                signature, timestamp = self._generate_signature(method, endpoint, query_string, body)
+                headers = {
+                    'api-key': self.api_key,
+                    'signature': signature,
+                    'timestamp': timestamp,
+                    'Content-Type': 'application/json'
+                }
             try:
-                response = requests.request(
+                async with self.session.request(
                     method, url, headers=headers, 
-                    json=data if data else None,
-                    timeout=API_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"API Error: {response.status_code} - {response.text}")
-                    if attempt == MAX_RETRIES - 1:
+                    data=body or None
+                ) as response:
+                    status = response.status
+                    if status == 200:
+                        return await self._read_json(response, endpoint)
+                    if status not in _RETRYABLE_STATUSES:
+                        logger.error("API Error: %s - %s", status, await response.text())
                         return None
-                    time.sleep(2 ** attempt)  # Exponential backoff
+
+                # Retryable: back off without decoding the error body
+                logger.warning("API Error: %s (attempt %s)", status, attempt + 1)
+                if attempt == MAX_RETRIES - 1:
+                    return None
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff
                     
             except Exception as e:
-                logger.error(f"Request exception (attempt {attempt + 1}): {e}")
+                logger.error("Request exception (attempt %s): %s", attempt + 1, e)
                 if attempt == MAX_RETRIES - 1:
                     return None
-                time.sleep(2 ** attempt)
+                await asyncio.sleep(2 ** attempt)
         
         return None
 
-    def get_products(self, contract_types: str = 'call_options,put_options') -> Optional[List[Dict]]:
-        """Fetch available option contracts"""
-        response = self._make_request('GET', '/v2/products', 
-                                     params={'contract_types': contract_types})
-        if response and 'result' in response:
-            return response['result']
+    async def _get_products_entry(self, contract_types: str) -> Optional[Tuple[float, List[Dict], Dict[Tuple[str, Optional[str]], OptionChain]]]:
+        """Return the cached products snapshot, refreshing it once stale"""
+        entry = _products_cache.get(contract_types)
+        if entry and time.monotonic() - entry[0] < PRODUCTS_CACHE_SECONDS:
+            return entry
+
+        async with _products_locks[contract_types]:
+            # Another caller may have refreshed while this one waited
+            entry = _products_cache.get(contract_types)
+            if entry and time.monotonic() - entry[0] < PRODUCTS_CACHE_SECONDS:
+                return entry
+
+            response = await self._make_request('GET', '/v2/products', 
+                                         params={'contract_types': contract_types},
+                                         auth=False)
+            if response and 'result' in response:
+                entry = (time.monotonic(), response['result'], {})
+                _products_cache[contract_types] = entry
+                return entry
         return None
 
-    def get_ticker(self, symbol: str) -> Optional[Dict]:
+    async def get_products(self, contract_types: str = 'call_options,put_options') -> Optional[List[Dict]]:
+        """Fetch available option contracts"""
+        entry = await self._get_products_entry(contract_types)
+        return entry[1] if entry else None
+
+    async def get_option_chain(self, underlying: str = 'BTC',
+                         contract_types: str = 'call_options,put_options',
+                         expiry: Optional[str] = None,
+                         expiry_type: Optional[str] = None) -> Optional[OptionChain]:
+        """Get calls and puts for an underlying, optionally for one DDMMYY expiry
+        or for the next expiry of expiry_type"""
+        if expiry_type is not None:
+            return await self._get_option_chain_for_type(underlying, contract_types, expiry_type)
+
+        entry = await self._get_products_entry(contract_types)
+        if not entry:
+            return None
+
+        underlying = underlying.upper()
+        key = (underlying, expiry)
+        chains = entry[2]
+        chain = chains.get(key)
+        if chain is None:
+            chain = chains[key] = OptionChain.from_products(entry[1], underlying, expiry)
+        return chain
+
+    async def _get_option_chain_for_type(self, underlying: str, contract_types: str,
+                                         expiry_type: str) -> Optional[OptionChain]:
+        """Chain for the next expiry of expiry_type, falling back to the next listed one"""
+        expiry = get_expiry_date(expiry_type)
+        option_chain = await self.get_option_chain(underlying, contract_types, expiry)
+        if option_chain is None or option_chain.calls or option_chain.puts:
+            return option_chain
+
+        listed = await self.get_next_listed_expiry(underlying, expiry)
+        if listed:
+            logger.warning("No %s options listed for expiry %s, using %s", underlying, expiry, listed)
+            return await self.get_option_chain(underlying, contract_types, listed)
+
+        logger.warning("No %s options listed for expiry %s, using all expiries", underlying, expiry)
+        return await self.get_option_chain(underlying, contract_types)
+
+    async def get_next_listed_expiry(self, underlying: str, expiry: str) -> Optional[str]:
+        """Earliest DDMMYY expiry listed for the underlying on or after expiry"""
+        target = parse_expiry(expiry)
+        option_chain = await self.get_option_chain(underlying)
+        if target is None or option_chain is None:
+            return None
+        return next((listed for listed in option_chain.expiries
+                     if parse_expiry(listed) >= target), None)
+
+    async def get_ticker(self, symbol: str) -> Optional[Dict]:
         """Get real-time ticker data for a symbol"""
-        response = self._make_request('GET', '/v2/tickers', params={'symbol': symbol})
+        # Concurrent lookups of one symbol share a single in-flight request
+        pending = _ticker_inflight.get(symbol)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_ticker(symbol))
+            _ticker_inflight[symbol] = pending
+            pending.add_done_callback(lambda _: _ticker_inflight.pop(symbol, None))
+        # Shielded so one cancelled waiter doesn't cancel the fetch for the rest
+        return await asyncio.shield(pending)
+
+    async def _fetch_ticker(self, symbol: str) -> Optional[Dict]:
+        response = await self._make_request('GET', '/v2/tickers', params={'symbol': symbol},
+                                     auth=False)
         if response and 'result' in response:
             return response['result'][0] if response['result'] else None
         return None
 
-    def get_spot_price(self, symbol: str = 'BTCUSD') -> Optional[float]:
+    async def get_mark_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Mark price per symbol, fetched concurrently; unavailable symbols are omitted"""
+        symbols = list(symbols)
+        # /v2/tickers takes one symbol per request; bounded so a user with
+        # many legs can't burst past the API rate limit
+        limit = asyncio.Semaphore(TICKER_MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(symbol: str) -> Optional[Dict]:
+            async with limit:
+                return await self.get_ticker(symbol)
+
+        # Under a TaskGroup an unexpected failure cancels the sibling fetches
+        # instead of leaving them running; the caller sees no prices
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(fetch(symbol)) for symbol in symbols]
+        except* Exception as eg:
+            logger.error("Failed to fetch tickers for %s: %s", symbols, eg.exceptions)
+            tasks = []
+        return {
+            symbol: float(ticker['mark_price'])
+            for symbol, ticker in zip(symbols, (task.result() for task in tasks))
+            if ticker and 'mark_price' in ticker
+        }
+
+    async def get_spot_price(self, symbol: str = 'BTCUSD') -> Optional[float]:
         """Get current spot price"""
-        ticker = self.get_ticker(symbol)
+        symbol = _CONTRACT_MAP.get(symbol.upper(), symbol)
+        cached = _spot_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < SPOT_PRICE_CACHE_SECONDS:
+            return cached[1]
+
+        ticker = await self.get_ticker(symbol)
         if ticker and 'mark_price' in ticker:
-            return float(ticker['mark_price'])
+            price = float(ticker['mark_price'])
+            _spot_cache[symbol] = (time.monotonic(), price)
+            logger.debug("spot %s=%s", symbol, price)
+            return price
         return None
 
-    def place_order(self, product_id: int, size: int, side: str, 
+    async def place_order(self, product_id: int, size: int, side: str, 
                    order_type: str = 'market_order', 
                    limit_price: Optional[float] = None) -> Optional[Dict]:
         """Place an order"""
@@ -115,43 +399,93 @@ class DeltaExchangeAPI:
         if limit_price and order_type == 'limit_order':
             order_data['limit_price'] = str(limit_price)
         
-        response = self._make_request('POST', '/v2/orders', data=order_data)
+        response = await self._make_request('POST', '/v2/orders', data=order_data)
+        if response and 'result' in response:
+            return response['result']
+        return None
+
+    async def cancel_order(self, product_id: int, order_id: int) -> Optional[Dict]:
+        """Cancel an open order"""
+        response = await self._make_request('DELETE', '/v2/orders',
+                                     data={'id': order_id, 'product_id': product_id})
         if response and 'result' in response:
             return response['result']
         return None
 
-    def get_order_status(self, order_id: int) -> Optional[Dict]:
+    async def get_order_status(self, order_id: int) -> Optional[Dict]:
         """Check order status"""
-        response = self._make_request('GET', f'/v2/orders/{order_id}')
+        response = await self._get(f'/v2/orders/{order_id}')
         if response and 'result' in response:
             return response['result']
         return None
 
-    def get_positions(self) -> Optional[List[Dict]]:
-        """Fetch active positions"""
-        response = self._make_request('GET', '/v2/positions')
+    async def get_positions(self) -> Optional[List[Dict]]:
+        """Fetch active positions across the traded underlyings"""
+        # Positions are queried per underlying; issue them together
+        responses = await asyncio.gather(*(
+            self._make_request('GET', '/v2/positions',
+                               params={'underlying_asset_symbol': underlying})
+            for underlying in _POSITION_UNDERLYINGS
+        ), return_exceptions=True)
+
+        positions = None
+        for underlying, response in zip(_POSITION_UNDERLYINGS, responses):
+            if isinstance(response, Exception):
+                logger.error("Failed to fetch %s positions: %s", underlying, response)
+            elif response and 'result' in response:
+                positions = (positions or []) + response['result']
+        return positions
+
+    async def get_position(self, product_id: int) -> Optional[Dict]:
+        """Fetch the position for a single product"""
+        response = await self._make_request('GET', '/v2/positions',
+                                     params={'product_id': product_id})
         if response and 'result' in response:
             return response['result']
         return None
 
-    def get_wallet_balance(self) -> Optional[Dict]:
+    async def get_wallet_balance(self) -> Optional[Dict]:
         """Check wallet balance"""
-        response = self._make_request('GET', '/v2/wallet/balances')
+        response = await self._get('/v2/wallet/balances')
         if response and 'result' in response:
             return response['result']
         return None
 
-    def close_position(self, product_id: int) -> Optional[Dict]:
+    async def close_position(self, product_id: int) -> Optional[Dict]:
         """Close a position"""
-        positions = self.get_positions()
-        if not positions:
+        position = await self.get_position(product_id)
+        if not position:
             return None
         
-        for position in positions:
-            if position.get('product_id') == product_id:
-                size = abs(int(position.get('size', 0)))
-                side = 'sell' if float(position.get('size', 0)) > 0 else 'buy'
-                return self.place_order(product_id, size, side)
+        size = abs(int(position.get('size', 0)))
+        if size:
+            side = 'sell' if float(position.get('size', 0)) > 0 else 'buy'
+            return await self.place_order(product_id, size, side)
         
         return None
-        
+
+class DeltaApiPool:
+    """LRU of API clients keyed by credentials, reused across bot commands"""
+
+    def __init__(self, maxsize: int = API_CLIENT_POOL_SIZE):
+        self.maxsize = maxsize
+        self._instances: OrderedDict = OrderedDict()
+
+    def get(self, api_key: str, api_secret: str) -> DeltaExchangeAPI:
+        """Return the cached client for these credentials, creating it if needed"""
+        key = (api_key, api_secret)
+        api = self._instances.get(key)
+        if api is None:
+            api = DeltaExchangeAPI(api_key, api_secret)
+            self._instances[key] = api
+            if len(self._instances) > self.maxsize:
+                self._instances.popitem(last=False)
+        else:
+            self._instances.move_to_end(key)
+        return api
+
+    def clear(self):
+        """Drop all cached clients"""
+        self._instances.clear()
+
+api_pool = DeltaApiPool()
@@ -0,0 +1,54 @@
+import aiohttp
+from typing import Optional
+from config.settings import (
+    DELTA_BASE_URL, API_TIMEOUT, API_CONNECT_TIMEOUT, HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_SECONDS, HTTP_KEEPALIVE_SECONDS
+)
+import logging
+
+try:
+    import brotli  # noqa: F401  installed with aiohttp[speedups]
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'TelegramStraddleBot/1.0'
+
+# A slow connect fails fast on its own budget instead of eating the whole
+# request's; sock_read bounds each stall while a body is streaming
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(
+    total=API_TIMEOUT, connect=API_CONNECT_TIMEOUT, sock_read=API_TIMEOUT
+)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the process-wide keep-alive session for Delta Exchange calls"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+            enable_cleanup_closed=True
+        )
+        # Requests carry only the path; host and default headers are
+        # session-wide. Compressed bodies cut /v2/products transfer severalfold
+        _session = aiohttp.ClientSession(
+            base_url=DELTA_BASE_URL,
+            connector=connector,
+            headers={'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING},
+            timeout=REQUEST_TIMEOUT
+        )
+    return _session
+
+async def close_session():
+    """Close the shared session and its pooled connections"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+        logger.info("HTTP session closed")
@@ -1,42 +1,92 @@
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from trading.delta_api import DeltaExchangeAPI
 import logging
 import time
+import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Final order states: filled, or ended without a fill
+FILLED_STATES = frozenset(('filled', 'closed'))
+FAILED_STATES = frozenset(('cancelled', 'rejected'))
+
+# (elapsed seconds, poll interval) tiers: most orders fill within seconds,
+# so poll fast first and slow down as an order lingers
+_POLL_SCHEDULE = ((5, 1), (30, 2), (120, 5))
+_MAX_POLL_INTERVAL = 15
+# Market orders usually fill within a few hundred milliseconds; a short
+# burst of quick polls catches them before the first 1s tier
+_FAST_POLL_COUNT = 5
+_FAST_POLL_INTERVAL = 0.1
+
+def _poll_interval(elapsed: float) -> float:
+    """Poll interval for an order that has been open for `elapsed` seconds"""
+    for limit, interval in _POLL_SCHEDULE:
+        if elapsed < limit:
+            return interval
+    return _MAX_POLL_INTERVAL
+
 class OrderManager:
     def __init__(self, api: DeltaExchangeAPI):
         self.api = api
 
-    def monitor_order_fill(self, order_id: int, max_wait_seconds: int = 30) -> Optional[Dict]:
+    async def monitor_order_fill(self, order_id: int, max_wait_seconds: int = 30) -> Optional[Dict]:
         """Monitor order until filled or timeout"""
-        start_time = time.time()
+        start_time = time.monotonic()
+        failure_interval = 0
+        polls = 0
         
-        while time.time() - start_time < max_wait_seconds:
-            order_status = self.api.get_order_status(order_id)
-            
-            if not order_status:
-                logger.error(f"Failed to fetch order status for {order_id}")
-                return None
-            
-            state = order_status.get('state', '')
-            
-            if state in ['filled', 'closed']:
-                logger.info(f"Order {order_id} filled")
-                return order_status
-            elif state in ['cancelled', 'rejected']:
-                logger.warning(f"Order {order_id} {state}")
-                return None
-            
-            time.sleep(1)
-        
-        logger.warning(f"Order {order_id} monitoring timeout")
-        return None
+        try:
+            # The deadline also bounds in-flight status requests and sleeps
+            async with asyncio.timeout(max_wait_seconds):
+                while True:
+                    order_status = await self.api.get_order_status(order_id)
+                    
+                    if not order_status:
+                        # Back off on failed lookups instead of hammering a struggling API
+                        failure_interval = min(failure_interval * 2 or 1, _MAX_POLL_INTERVAL)
+                        logger.error("Failed to fetch order status for %s, retrying in %ss",
+                                     order_id, failure_interval)
+                        await asyncio.sleep(failure_interval)
+                        continue
+                    failure_interval = 0
+                    
+                    state = order_status.get('state', '')
+                    
+                    if state in FILLED_STATES:
+                        logger.info("Order %s filled", order_id)
+                        return order_status
+                    elif state in FAILED_STATES:
+                        logger.warning("Order %s %s", order_id, state)
+                        return None
+                    
+                    polls += 1
+                    if polls < _FAST_POLL_COUNT:
+                        await asyncio.sleep(_FAST_POLL_INTERVAL)
+                    else:
+                        await asyncio.sleep(_poll_interval(time.monotonic() - start_time))
+        except TimeoutError:
+            logger.warning("Order %s monitoring timeout", order_id)
+            return None
 
-    def close_position_by_product(self, product_id: int) -> Optional[Dict]:
+    async def close_position_by_product(self, product_id: int) -> Optional[Dict]:
         """Close a specific position"""
-        return self.api.close_position(product_id)
+        return await self.api.close_position(product_id)
+
+    async def close_positions(self, product_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Close several positions at once, keyed by product id"""
+        # Independent exits; an emergency close shouldn't wait on each in turn
+        results = await asyncio.gather(
+            *(self.api.close_position(product_id) for product_id in product_ids),
+            return_exceptions=True
+        )
+        closed = {}
+        for product_id, result in zip(product_ids, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to close position %s: %s", product_id, result)
+                result = None
+            closed[product_id] = result
+        return closed
 
     def get_fill_price(self, order: Dict) -> Optional[float]:
         """Extract average fill price from order"""
@@ -49,8 +99,35 @@ class OrderManager:
         if not call_order or not put_order:
             return False
         
-        call_filled = call_order.get('state') in ['filled', 'closed']
-        put_filled = put_order.get('state') in ['filled', 'closed']
+        call_filled = call_order.get('state') in FILLED_STATES
+        put_filled = put_order.get('state') in FILLED_STATES
         
         return call_filled and put_filled
-        
+
+async def execute_legs(api: DeltaExchangeAPI, call_product_id: int, put_product_id: int,
+                       lot_size: int, direction: str, strategy: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Place both option legs together, reversing a lone fill if the other leg fails"""
+    side = 'buy' if direction == 'long' else 'sell'
+    place_order = api.place_order
+    
+    # The legs are independent orders; submit them together
+    call_order, put_order = await asyncio.gather(
+        place_order(call_product_id, lot_size, side),
+        place_order(put_product_id, lot_size, side)
+    )
+
+    if not call_order or not put_order:
+        reverse_side = 'sell' if side == 'buy' else 'buy'
+        # Attempt rollback of whichever leg went through
+        if call_order:
+            logger.error("Failed to place put order, attempting to cancel call order")
+            await place_order(call_product_id, lot_size, reverse_side)
+        elif put_order:
+            logger.error("Failed to place call order, attempting to cancel put order")
+            await place_order(put_product_id, lot_size, reverse_side)
+        else:
+            logger.error("Failed to place call and put orders")
+        return None, None
+
+    logger.info("Successfully executed %s %s", direction, strategy)
+    return call_order, put_order
@@ -1,113 +1,151 @@
+from dataclasses import dataclass
 from typing import List, Dict, Optional
 from trading.delta_api import DeltaExchangeAPI
 from database.crud import TradeCRUD
-from utils.helpers import calculate_pnl
+from utils.helpers import premium_trigger_levels
 import logging
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Size values of closed positions, as the API returns them
+_ZERO_SIZES = (0, '0', None)
+
+@dataclass(slots=True, frozen=True)
+class Position:
+    """An open position priced at the current mark"""
+    product_id: int
+    symbol: str
+    size: float
+    entry_price: float
+    current_price: float
+    unrealized_pnl: float
+    pnl_percentage: float
+
+    @classmethod
+    def from_api(cls, raw: Dict, size: float, current_price: float) -> 'Position':
+        """Build from a /v2/positions entry whose size has already been parsed"""
+        entry_price = float(raw.get('entry_price', 0))
+        # Unrealized P&L; size is negative for shorts, so one formula covers both
+        unrealized_pnl = (current_price - entry_price) * size
+        return cls(
+            product_id=raw.get('product_id'),
+            symbol=raw.get('symbol'),
+            size=size,
+            entry_price=entry_price,
+            current_price=current_price,
+            unrealized_pnl=unrealized_pnl,
+            pnl_percentage=(unrealized_pnl / (entry_price * abs(size))) * 100 if entry_price > 0 else 0
+        )
+
 class PositionMonitor:
     def __init__(self, api: DeltaExchangeAPI):
         self.api = api
         self.trade_crud = TradeCRUD()
 
-    def get_active_positions_details(self) -> Optional[List[Dict]]:
+    async def get_active_positions_details(self) -> Optional[List[Position]]:
         """Fetch all active positions with details"""
-        positions = self.api.get_positions()
+        positions = await self.api.get_positions()
         if not positions:
             return []
         
-        detailed_positions = []
-        
+        open_positions = []
         for position in positions:
-            if float(position.get('size', 0)) == 0:
+            # Closed entries come back with a zero size; skip them unparsed
+            raw_size = position.get('size')
+            if raw_size in _ZERO_SIZES:
                 continue
-            
-            product_id = position.get('product_id')
-            symbol = position.get('symbol')
-            size = float(position.get('size', 0))
-            entry_price = float(position.get('entry_price', 0))
-            
-            # Get current market price
-            ticker = self.api.get_ticker(symbol)
-            current_price = float(ticker.get('mark_price', 0)) if ticker else 0
-            
-            # Calculate unrealized P&L
-            if size > 0:  # Long position
-                unrealized_pnl = (current_price - entry_price) * abs(size)
-            else:  # Short position
-                unrealized_pnl = (entry_price - current_price) * abs(size)
-            
-            detailed_positions.append({
-                'product_id': product_id,
-                'symbol': symbol,
-                'size': size,
-                'entry_price': entry_price,
-                'current_price': current_price,
-                'unrealized_pnl': unrealized_pnl,
-                'pnl_percentage': (unrealized_pnl / (entry_price * abs(size))) * 100 if entry_price > 0 else 0
-            })
+            size = float(raw_size)
+            if size:
+                open_positions.append((position, size))
+        
+        # Current market prices for every position, fetched together
+        prices = await self.api.get_mark_prices({position.get('symbol') for position, _ in open_positions})
+        
+        detailed_positions = [
+            Position.from_api(position, size, prices.get(position.get('symbol'), 0))
+            for position, size in open_positions
+        ]
         
         return detailed_positions
 
-    def check_stop_loss_target(self, trade_id: str, stop_loss_pct: float, 
+    async def check_stop_loss_target(self, trade_id: str, stop_loss_pct: Optional[float] = None, 
                               target_pct: Optional[float] = None) -> Optional[str]:
         """Check if stop loss or target hit"""
-        trade = self.trade_crud.get_trade_by_id(trade_id)
+        trade = await asyncio.to_thread(self.trade_crud.get_trade_by_id, trade_id)
         if not trade or trade['status'] != 'active':
             return None
         
-        call_symbol = trade['call_symbol']
-        put_symbol = trade['put_symbol']
-        call_entry = trade['call_entry_price']
-        put_entry = trade['put_entry_price']
-        lot_size = trade['lot_size']
-        direction = trade.get('direction', 'long')
-        
         # Get current prices
-        call_ticker = self.api.get_ticker(call_symbol)
-        put_ticker = self.api.get_ticker(put_symbol)
+        prices = await self.api.get_mark_prices((trade['call_symbol'], trade['put_symbol']))
+        call_current = prices.get(trade['call_symbol'])
+        put_current = prices.get(trade['put_symbol'])
         
-        if not call_ticker or not put_ticker:
+        if call_current is None or put_current is None:
             return None
         
-        call_current = float(call_ticker.get('mark_price', 0))
-        put_current = float(put_ticker.get('mark_price', 0))
-        
-        # Calculate current P&L
-        current_pnl = calculate_pnl(call_entry, put_entry, call_current, 
-                                    put_current, lot_size, direction)
-        
-        entry_cost = (call_entry + put_entry) * lot_size
-        pnl_pct = (current_pnl / entry_cost) * 100 if entry_cost > 0 else 0
-        
-        # Check stop loss
-        if pnl_pct <= -stop_loss_pct:
-            return 'stop_loss'
-        
-        # Check target
-        if target_pct and pnl_pct >= target_pct:
-            return 'target'
-        
-        return None
+        return evaluate_trigger(trade, call_current, put_current, stop_loss_pct, target_pct)
 
-    def monitor_all_active_trades(self, user_id: str, stop_loss_pct: float, 
+    async def monitor_all_active_trades(self, user_id: str, stop_loss_pct: Optional[float] = None, 
                                   target_pct: Optional[float] = None) -> List[Dict]:
         """Monitor all active trades for a user"""
-        active_trades = self.trade_crud.get_active_trades(user_id)
-        alerts = []
+        active_trades = await asyncio.to_thread(self.trade_crud.get_active_trades, user_id)
         
+        # One ticker fetch per distinct leg, shared by every trade holding it
+        symbols = set()
+        for trade in active_trades:
+            symbols.add(trade['call_symbol'])
+            symbols.add(trade['put_symbol'])
+        prices = await self.api.get_mark_prices(symbols)
+        
+        alerts = []
         for trade in active_trades:
-            trade_id = str(trade['_id'])
-            trigger = self.check_stop_loss_target(trade_id, stop_loss_pct, target_pct)
+            call_current = prices.get(trade['call_symbol'])
+            put_current = prices.get(trade['put_symbol'])
+            if call_current is None or put_current is None:
+                continue
             
+            trigger = evaluate_trigger(trade, call_current, put_current,
+                                       stop_loss_pct, target_pct)
             if trigger:
                 alerts.append({
-                    'trade_id': trade_id,
+                    'trade_id': str(trade['_id']),
                     'trigger': trigger,
                     'trade': trade
                 })
         
         return alerts
-                                      
+
+def evaluate_trigger(trade: Dict, call_current: float, put_current: float,
+                     stop_loss_pct: Optional[float] = None,
+                     target_pct: Optional[float] = None) -> Optional[str]:
+    """Return 'stop_loss' or 'target' if the trade's combined premium crosses either level
+
+    Without explicit percentages the levels stored on the trade at entry are used;
+    an explicit percentage overrides only its own level.
+    """
+    if stop_loss_pct is None and target_pct is None and 'sl_premium' in trade:
+        stop_loss, target = trade['sl_premium'], trade.get('tp_premium')
+    else:
+        if stop_loss_pct is None:
+            stop_loss_pct = trade.get('stop_loss_pct')
+        if target_pct is None:
+            target_pct = trade.get('target_pct')
+        stop_loss, target = premium_trigger_levels(
+            trade['call_entry_price'] + trade['put_entry_price'],
+            trade.get('direction', 'long'), stop_loss_pct, target_pct
+        )
+    
+    premium = call_current + put_current
+    if trade.get('direction', 'long') == 'long':
+        if stop_loss is not None and premium <= stop_loss:
+            return 'stop_loss'
+        if target is not None and premium >= target:
+            return 'target'
+    else:
+        if stop_loss is not None and premium >= stop_loss:
+            return 'stop_loss'
+        if target is not None and premium <= target:
+            return 'target'
+    
+    return None
@@ -1,11 +1,14 @@
 from typing import Optional, Dict, Tuple
-from trading.delta_api import DeltaExchangeAPI
+from trading.delta_api import DeltaExchangeAPI, OptionChain
+from trading.order_manager import execute_legs
 from utils.helpers import round_to_strike, calculate_breakeven
 import logging
 
 logger = logging.getLogger(__name__)
 
 class StraddleStrategy:
+    __slots__ = ('api',)
+
     def __init__(self, api: DeltaExchangeAPI):
         self.api = api
 
@@ -13,78 +16,52 @@ class StraddleStrategy:
         """Find nearest ATM strike price"""
         return round_to_strike(spot_price, strike_interval)
 
-    def get_option_chain(self, underlying: str = 'BTC', expiry_type: str = 'weekly') -> Optional[Dict]:
-        """Fetch and organize option chain"""
-        products = self.api.get_products()
-        if not products:
-            return None
-
-        # Filter by underlying and expiry type
-        options = {
-            'calls': [],
-            'puts': []
-        }
-
-        for product in products:
-            symbol = product.get('symbol', '')
-            if underlying.upper() not in symbol.upper():
-                continue
-
-            contract_type = product.get('contract_type', '')
-            if contract_type == 'call_options':
-                options['calls'].append(product)
-            elif contract_type == 'put_options':
-                options['puts'].append(product)
-
-        return options
+    async def get_option_chain(self, underlying: str = 'BTC', expiry_type: str = 'weekly') -> Optional[OptionChain]:
+        """Fetch and organize option chain for the next expiry of expiry_type"""
+        return await self.api.get_option_chain(underlying, expiry_type=expiry_type)
 
-    def find_atm_options(self, spot_price: float, underlying: str = 'BTC', 
+    async def find_atm_options(self, spot_price: float, underlying: str = 'BTC', 
                         expiry_type: str = 'weekly') -> Optional[Tuple[Dict, Dict]]:
         """Find ATM call and put options"""
         atm_strike = self.find_atm_strike(spot_price)
-        option_chain = self.get_option_chain(underlying, expiry_type)
+        option_chain = await self.get_option_chain(underlying, expiry_type)
         
         if not option_chain:
             logger.error("Failed to fetch option chain")
             return None
 
-        # Find matching call and put at ATM strike
-        atm_call = None
-        atm_put = None
-
-        for call in option_chain['calls']:
-            if abs(float(call.get('strike_price', 0)) - atm_strike) < 1:
-                atm_call = call
-                break
-
-        for put in option_chain['puts']:
-            if abs(float(put.get('strike_price', 0)) - atm_strike) < 1:
-                atm_put = put
-                break
+        # Find matching call and put at ATM strike, else at the closest strike
+        # listed for both
+        strike_key = round(atm_strike)
+        if strike_key not in option_chain.calls_by_strike or strike_key not in option_chain.puts_by_strike:
+            nearest = option_chain.nearest_strike(spot_price)
+            if nearest is not None:
+                strike_key = atm_strike = nearest
+        atm_call = option_chain.calls_by_strike.get(strike_key)
+        atm_put = option_chain.puts_by_strike.get(strike_key)
 
         if atm_call and atm_put:
-            logger.info(f"Found ATM options at strike {atm_strike}")
+            logger.info("Found ATM options at strike %s", atm_strike)
             return atm_call, atm_put
         
-        logger.error(f"Could not find ATM options at strike {atm_strike}")
-        return None
-
-    def get_option_premium(self, symbol: str) -> Optional[float]:
-        """Get current option premium"""
-        ticker = self.api.get_ticker(symbol)
-        if ticker and 'mark_price' in ticker:
-            return float(ticker['mark_price'])
+        logger.error("Could not find ATM options at strike %s", atm_strike)
         return None
 
-    def calculate_straddle_details(self, call_option: Dict, put_option: Dict, 
+    async def calculate_straddle_details(self, call_option: Dict, put_option: Dict, 
                                    lot_size: int, direction: str) -> Dict:
         """Calculate straddle trade details"""
-        call_premium = self.get_option_premium(call_option['symbol'])
-        put_premium = self.get_option_premium(put_option['symbol'])
+        premiums = await self.api.get_mark_prices((call_option['symbol'], put_option['symbol']))
+        call_premium, put_premium = premiums.get(call_option['symbol']), premiums.get(put_option['symbol'])
         
         if not call_premium or not put_premium:
             return None
+        return self.straddle_details(call_option, put_option, call_premium, put_premium,
+                                     lot_size, direction)
 
+    @staticmethod
+    def straddle_details(call_option: Dict, put_option: Dict, call_premium: float,
+                         put_premium: float, lot_size: int, direction: str) -> Dict:
+        """Price a straddle from already-fetched premiums"""
         strike = float(call_option['strike_price'])
         total_premium = call_premium + put_premium
         total_cost = total_premium * lot_size
@@ -107,32 +84,15 @@ class StraddleStrategy:
             'direction': direction
         }
 
-    def execute_straddle(self, call_product_id: int, put_product_id: int, 
+    async def execute_straddle(self, call_product_id: int, put_product_id: int, 
                         lot_size: int, direction: str) -> Tuple[Optional[Dict], Optional[Dict]]:
         """Execute both legs of straddle"""
-        side = 'buy' if direction == 'long' else 'sell'
-        
-        # Place call order
-        call_order = self.api.place_order(call_product_id, lot_size, side)
-        if not call_order:
-            logger.error("Failed to place call order")
-            return None, None
-
-        # Place put order
-        put_order = self.api.place_order(put_product_id, lot_size, side)
-        if not put_order:
-            logger.error("Failed to place put order, attempting to cancel call order")
-            # Attempt rollback
-            reverse_side = 'sell' if side == 'buy' else 'buy'
-            self.api.place_order(call_product_id, lot_size, reverse_side)
-            return None, None
-
-        logger.info(f"Successfully executed {direction} straddle")
-        return call_order, put_order
+        return await execute_legs(self.api, call_product_id, put_product_id,
+                                  lot_size, direction, 'straddle')
 
-    def validate_margin(self, total_cost: float) -> bool:
+    async def validate_margin(self, total_cost: float) -> bool:
         """Validate sufficient margin for trade"""
-        balance = self.api.get_wallet_balance()
+        balance = await self.api.get_wallet_balance()
         if not balance:
             return False
 
@@ -1,11 +1,14 @@
 from typing import Optional, Dict, Tuple, List
-from trading.delta_api import DeltaExchangeAPI
+from trading.delta_api import DeltaExchangeAPI, OptionChain
+from trading.order_manager import execute_legs
 from utils.helpers import round_to_strike, calculate_breakeven
 import logging
 
 logger = logging.getLogger(__name__)
 
 class StrangleStrategy:
+    __slots__ = ('api',)
+
     def __init__(self, api: DeltaExchangeAPI):
         self.api = api
 
@@ -20,78 +23,47 @@ class StrangleStrategy:
         put_strike = atm_strike - (put_offset * strike_interval)
         return call_strike, put_strike
 
-    def get_option_chain(self, underlying: str = 'BTC', expiry_type: str = 'weekly') -> Optional[Dict]:
-        """Fetch and organize option chain"""
-        products = self.api.get_products()
-        if not products:
-            return None
-
-        options = {
-            'calls': [],
-            'puts': []
-        }
-
-        for product in products:
-            symbol = product.get('symbol', '')
-            if underlying.upper() not in symbol.upper():
-                continue
-
-            contract_type = product.get('contract_type', '')
-            if contract_type == 'call_options':
-                options['calls'].append(product)
-            elif contract_type == 'put_options':
-                options['puts'].append(product)
+    async def get_option_chain(self, underlying: str = 'BTC', expiry_type: str = 'weekly') -> Optional[OptionChain]:
+        """Fetch and organize option chain for the next expiry of expiry_type"""
+        return await self.api.get_option_chain(underlying, expiry_type=expiry_type)
 
-        return options
-
-    def find_otm_options(self, call_strike: float, put_strike: float, 
+    async def find_otm_options(self, call_strike: float, put_strike: float, 
                         underlying: str = 'BTC', expiry_type: str = 'weekly') -> Optional[Tuple[Dict, Dict]]:
         """Find OTM call and put options at specified strikes"""
-        option_chain = self.get_option_chain(underlying, expiry_type)
+        option_chain = await self.get_option_chain(underlying, expiry_type)
         
         if not option_chain:
             logger.error("Failed to fetch option chain")
             return None
 
-        otm_call = None
-        otm_put = None
-
-        # Find matching call at OTM strike
-        for call in option_chain['calls']:
-            if abs(float(call.get('strike_price', 0)) - call_strike) < 1:
-                otm_call = call
-                break
-
-        # Find matching put at OTM strike
-        for put in option_chain['puts']:
-            if abs(float(put.get('strike_price', 0)) - put_strike) < 1:
-                otm_put = put
-                break
+        # Find matching call and put at the OTM strikes
+        otm_call = option_chain.calls_by_strike.get(round(call_strike))
+        otm_put = option_chain.puts_by_strike.get(round(put_strike))
 
         if otm_call and otm_put:
-            logger.info(f"Found OTM options: Call@{call_strike}, Put@{put_strike}")
+            logger.info("Found OTM options: Call@%s, Put@%s", call_strike, put_strike)
             return otm_call, otm_put
         
-        logger.error(f"Could not find OTM options at specified strikes")
-        return None
-
-    def get_option_premium(self, symbol: str) -> Optional[float]:
-        """Get current option premium"""
-        ticker = self.api.get_ticker(symbol)
-        if ticker and 'mark_price' in ticker:
-            return float(ticker['mark_price'])
+        logger.error("Could not find OTM options at specified strikes")
         return None
 
-    def calculate_strangle_details(self, call_option: Dict, put_option: Dict, 
+    async def calculate_strangle_details(self, call_option: Dict, put_option: Dict, 
                                    atm_strike: float, lot_size: int, 
                                    direction: str, atm_straddle_premium: Optional[float] = None) -> Dict:
         """Calculate strangle trade details with comparison to straddle"""
-        call_premium = self.get_option_premium(call_option['symbol'])
-        put_premium = self.get_option_premium(put_option['symbol'])
+        premiums = await self.api.get_mark_prices((call_option['symbol'], put_option['symbol']))
+        call_premium, put_premium = premiums.get(call_option['symbol']), premiums.get(put_option['symbol'])
         
         if not call_premium or not put_premium:
             return None
-
+        return self.strangle_details(call_option, put_option, call_premium, put_premium,
+                                     atm_strike, lot_size, direction, atm_straddle_premium)
+
+    @staticmethod
+    def strangle_details(call_option: Dict, put_option: Dict, call_premium: float,
+                         put_premium: float, atm_strike: float, lot_size: int, direction: str,
+                         atm_straddle_premium: Optional[float] = None) -> Dict:
+        """Price a strangle from already-fetched premiums"""
         call_strike = float(call_option['strike_price'])
         put_strike = float(put_option['strike_price'])
         total_premium = call_premium + put_premium
@@ -129,39 +101,22 @@ class StrangleStrategy:
 
         return result
 
-    def execute_strangle(self, call_product_id: int, put_product_id: int, 
+    async def execute_strangle(self, call_product_id: int, put_product_id: int, 
                         lot_size: int, direction: str) -> Tuple[Optional[Dict], Optional[Dict]]:
         """Execute both legs of strangle"""
-        side = 'buy' if direction == 'long' else 'sell'
-        
-        # Place call order
-        call_order = self.api.place_order(call_product_id, lot_size, side)
-        if not call_order:
-            logger.error("Failed to place call order")
-            return None, None
-
-        # Place put order
-        put_order = self.api.place_order(put_product_id, lot_size, side)
-        if not put_order:
-            logger.error("Failed to place put order, attempting to cancel call order")
-            # Attempt rollback
-            reverse_side = 'sell' if side == 'buy' else 'buy'
-            self.api.place_order(call_product_id, lot_size, reverse_side)
-            return None, None
-
-        logger.info(f"Successfully executed {direction} strangle")
-        return call_order, put_order
-
-    def validate_margin(self, total_cost: float) -> bool:
+        return await execute_legs(self.api, call_product_id, put_product_id,
+                                  lot_size, direction, 'strangle')
+
+    async def validate_margin(self, total_cost: float) -> bool:
         """Validate sufficient margin for trade"""
-        balance = self.api.get_wallet_balance()
+        balance = await self.api.get_wallet_balance()
         if not balance:
             return False
 
         available_balance = float(balance[0].get('available_balance', 0))
         return available_balance >= total_cost * 1.2  # 20% buffer
 
-    def compare_with_straddle(self, spot_price: float, call_offset: int, 
+    async def compare_with_straddle(self, spot_price: float, call_offset: int, 
                              put_offset: int, underlying: str = 'BTC') -> Optional[Dict]:
         """Compare strangle with ATM straddle"""
         from trading.straddle_logic import StraddleStrategy
@@ -169,26 +124,32 @@ class StrangleStrategy:
         straddle = StraddleStrategy(self.api)
         atm_strike = self.find_atm_strike(spot_price)
         
-        # Get ATM straddle details
-        atm_options = straddle.find_atm_options(spot_price, underlying)
+        # Get ATM straddle and OTM strangle legs
+        atm_options = await straddle.find_atm_options(spot_price, underlying)
         if not atm_options:
             return None
         
-        atm_call, atm_put = atm_options
-        atm_call_premium = self.get_option_premium(atm_call['symbol'])
-        atm_put_premium = self.get_option_premium(atm_put['symbol'])
-        atm_total = atm_call_premium + atm_put_premium
-        
-        # Get OTM strangle details
         call_strike, put_strike = self.calculate_otm_strikes(atm_strike, call_offset, put_offset)
-        otm_options = self.find_otm_options(call_strike, put_strike, underlying)
+        otm_options = await self.find_otm_options(call_strike, put_strike, underlying)
         
         if not otm_options:
             return None
         
+        # Price all four legs in one concurrent fetch
+        atm_call, atm_put = atm_options
         otm_call, otm_put = otm_options
-        otm_call_premium = self.get_option_premium(otm_call['symbol'])
-        otm_put_premium = self.get_option_premium(otm_put['symbol'])
+        premiums = await self.api.get_mark_prices((atm_call['symbol'], atm_put['symbol'],
+                                                   otm_call['symbol'], otm_put['symbol']))
+        atm_call_premium = premiums.get(atm_call['symbol'])
+        atm_put_premium = premiums.get(atm_put['symbol'])
+        otm_call_premium = premiums.get(otm_call['symbol'])
+        otm_put_premium = premiums.get(otm_put['symbol'])
+        
+        if (not atm_call_premium or not atm_put_premium
+                or not otm_call_premium or not otm_put_premium):
+            return None
+        
+        atm_total = atm_call_premium + atm_put_premium
         otm_total = otm_call_premium + otm_put_premium
         
         cost_savings = ((atm_total - otm_total) / atm_total) * 100
@@ -1,9 +1,28 @@
 from cryptography.fernet import Fernet
 from config.settings import ENCRYPTION_KEY
 import logging
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
 
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:
+    def json_dumps(data) -> bytes:
+        """Serialize to compact JSON bytes (stdlib fallback)"""
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    json_loads = json.loads
+
 class Encryptor:
     def __init__(self):
         if not ENCRYPTION_KEY:
@@ -42,11 +61,67 @@ def calculate_pnl(call_entry: float, put_entry: float, call_exit: float,
     
     return call_pnl + put_pnl
 
+def premium_trigger_levels(entry_premium: float, direction: str, stop_loss_pct: Optional[float],
+                           target_pct: Optional[float] = None) -> tuple:
+    """Combined call+put premium at which stop loss and target trigger"""
+    if not entry_premium or entry_premium <= 0:
+        return None, None
+    # Longs lose as premium falls; shorts lose as it rises
+    sign = -1 if direction == 'long' else 1
+    stop_loss = entry_premium * (1 + sign * stop_loss_pct / 100) if stop_loss_pct is not None else None
+    target = entry_premium * (1 - sign * target_pct / 100) if target_pct else None
+    return stop_loss, target
+
+# Delta options settle at 12:00 UTC (17:30 IST)
+EXPIRY_HOUR_UTC = 12
+
+def _last_friday(year: int, month: int) -> date:
+    """Last Friday of a month"""
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last_day = next_month - timedelta(days=1)
+    return last_day - timedelta(days=(last_day.weekday() - 4) % 7)
+
+def get_expiry_date(expiry_type: str = 'weekly', now: Optional[datetime] = None) -> str:
+    """Next daily, weekly (Friday) or monthly (last Friday) expiry as DDMMYY, as in option symbols"""
+    now = now or datetime.now(timezone.utc)
+    day = now.toordinal()
+    if now.hour >= EXPIRY_HOUR_UTC:
+        # Today's contracts have already settled
+        day += 1
+    return _expiry_date_for(expiry_type, day)
+
+@lru_cache(maxsize=8)
+def _expiry_date_for(expiry_type: str, day_ordinal: int) -> str:
+    """Expiry for the first trading day still open, computed once per (type, day)"""
+    day = date.fromordinal(day_ordinal)
+    if expiry_type == 'weekly':
+        day += timedelta(days=(4 - day.weekday()) % 7)
+    elif expiry_type == 'monthly':
+        expiry = _last_friday(day.year, day.month)
+        if expiry < day:
+            expiry = _last_friday(day.year + day.month // 12, day.month % 12 + 1)
+        day = expiry
+    
+    return day.strftime('%d%m%y')
+
+@lru_cache(maxsize=64)
+def parse_expiry(ddmmyy: str) -> Optional[date]:
+    """Date of a DDMMYY expiry as used in option symbols, or None if malformed"""
+    if len(ddmmyy) != 6 or not ddmmyy.isdigit():
+        return None
+    try:
+        return date(2000 + int(ddmmyy[4:]), int(ddmmyy[2:4]), int(ddmmyy[:2]))
+    except ValueError:
+        return None
+
 def format_currency(amount: float) -> str:
     """Format amount as Indian Rupees"""
     return f"₹{amount:,.2f}"
 
 def round_to_strike(price: float, strike_interval: float = 500) -> float:
-    """Round price to nearest strike interval"""
-    return round(price / strike_interval) * strike_interval
+    """Round price to nearest strike interval, halfway prices rounding up"""
+    interval = int(strike_interval)
+    if interval != strike_interval or interval <= 0:
+        return round(price / strike_interval) * strike_interval
+    return float((int(price * 2) + interval) // (2 * interval) * interval)
     
@@ -1,25 +1,41 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 
+_listener = None
+
 def setup_logger():
     """Configure logging for the application"""
+    global _listener
     logger = logging.getLogger()
+    if _listener is not None:
+        return logger
     logger.setLevel(logging.INFO)
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
-    
+
     # Format
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
+
+    # Records are queued and written from a listener thread so stdout
+    # never blocks the event loop
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
     return logger
 
 logger = setup_logger()